@@ -5,6 +5,7 @@ Provides:
 - a configured async transport wrapper (httpx AsyncClient),
 - file-based caching primitives (readwrite/readonly/off),
 - retry/backoff policies (tenacity integration),
+- per-vendor circuit breakers with fast-fail degraded mode,
 - consistent request metadata (timeouts, headers, user-agent).
 
 Vendor clients compose these primitives rather than re-implementing HTTP concerns.
@@ -0,0 +1,370 @@
+# src/loom/core/http/breaker.py
+"""
+Per-vendor circuit breakers.
+
+Prevents a vendor outage (FMP, SEC, ...) from consuming the full retry budget for every ticker
+in a batch. Each vendor has one breaker shared by all requests to that vendor:
+
+- closed:    calls pass through; outcomes are recorded in a sliding time window.
+- open:      calls fail immediately with `CircuitOpenError` (no network, no retry/backoff).
+             Entered when, over at least `min_calls` in the window, the failure rate or the
+             slow-call rate reaches its threshold.
+- half_open: after `open_seconds`, a single probe call is let through; concurrent callers
+             still fail fast. A successful (non-slow) probe closes the breaker and clears the
+             window; otherwise the breaker re-opens for another `open_seconds`. A probe that
+             has not reported back within `probe_timeout_seconds` counts as failed, so a hung
+             call cannot pin the breaker half-open.
+
+Integration:
+- The transport wraps each individual attempt (inside the tenacity loop) with
+  `breaker.call(...)`, so a breaker that opens mid-retry stops the remaining attempts.
+- `CircuitOpenError` is never retried.
+- Callers decide what counts as a failure (e.g., transport errors and 5xx/429 count;
+  404 does not) by recording outcomes explicitly or passing `is_failure` to `call(...)`.
+  Explicit callers must pass the token returned by `before_call()` back to
+  `record_success` / `record_failure` / `release_probe`.
+
+Degraded mode:
+- `CircuitOpenError` carries the vendor and the seconds until the next probe is allowed.
+  The transport may serve cached responses (ignoring TTL) instead; strategies otherwise treat
+  the affected metrics as missing and apply `missingness_policy` (required -> fail,
+  optional/warn_if_missing -> warn and omit).
+
+Observability:
+- Every state transition emits `event="http.breaker_state_changed"` with
+  {vendor, from_state, to_state, reason, failure_rate, slow_call_rate, calls}.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict, Mapping, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class BreakerConfigError(RuntimeError):
+    pass
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of making a call while a vendor breaker is open.
+
+    - vendor: breaker key (e.g., "fmp", "sec")
+    - retry_after_seconds: time until a probe will be allowed (0 while a probe is in flight)
+    """
+
+    def __init__(self, vendor: str, retry_after_seconds: float) -> None:
+        super().__init__(
+            f"Circuit open for vendor '{vendor}' (retry in {retry_after_seconds:.1f}s)"
+        )
+        self.vendor = vendor
+        self.retry_after_seconds = retry_after_seconds
+
+
+@dataclass(frozen=True)
+class BreakerPolicy:
+    """
+    Trip/recovery thresholds.
+
+    - window_seconds: sliding window for outcome statistics
+    - min_calls: calls required in the window before the breaker may trip
+    - failure_rate_threshold: trip when failed / calls >= this
+    - slow_call_seconds: a call taking at least this long counts as slow
+    - slow_call_rate_threshold: trip when slow / calls >= this
+    - open_seconds: time spent open before a half-open probe is allowed
+    - probe_timeout_seconds: a half-open probe outstanding this long is treated as failed
+    """
+    window_seconds: float = 60.0
+    min_calls: int = 10
+    failure_rate_threshold: float = 0.5
+    slow_call_seconds: float = 10.0
+    slow_call_rate_threshold: float = 0.8
+    open_seconds: float = 30.0
+    probe_timeout_seconds: float = 30.0
+
+    def __post_init__(self) -> None:
+        for name in ("failure_rate_threshold", "slow_call_rate_threshold"):
+            value = getattr(self, name)
+            if not 0.0 < value <= 1.0:
+                raise BreakerConfigError(f"breaker {name} must be in (0, 1]: {value}")
+        for name in (
+            "window_seconds",
+            "slow_call_seconds",
+            "open_seconds",
+            "probe_timeout_seconds",
+        ):
+            value = getattr(self, name)
+            if not value > 0.0:
+                raise BreakerConfigError(f"breaker {name} must be > 0: {value}")
+        if self.min_calls < 1:
+            raise BreakerConfigError(f"breaker min_calls must be >= 1: {self.min_calls}")
+
+    @staticmethod
+    def from_mapping(
+        cfg: Mapping[str, Any], base: Optional["BreakerPolicy"] = None
+    ) -> "BreakerPolicy":
+        b = base or BreakerPolicy()
+        try:
+            return BreakerPolicy(
+                window_seconds=float(cfg.get("window_seconds", b.window_seconds)),
+                min_calls=int(cfg.get("min_calls", b.min_calls)),
+                failure_rate_threshold=float(
+                    cfg.get("failure_rate_threshold", b.failure_rate_threshold)
+                ),
+                slow_call_seconds=float(cfg.get("slow_call_seconds", b.slow_call_seconds)),
+                slow_call_rate_threshold=float(
+                    cfg.get("slow_call_rate_threshold", b.slow_call_rate_threshold)
+                ),
+                open_seconds=float(cfg.get("open_seconds", b.open_seconds)),
+                probe_timeout_seconds=float(
+                    cfg.get("probe_timeout_seconds", b.probe_timeout_seconds)
+                ),
+            )
+        except (TypeError, ValueError) as e:
+            raise BreakerConfigError(f"Invalid breaker settings: {e}") from e
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker for a single vendor.
+
+    `before_call()` returns a probe token when the call is the half-open probe (else None);
+    the token must be passed back with the outcome. Only the admitted probe decides the
+    half-open transition; results of other calls that finish while open/half-open are dropped.
+
+    Not thread-safe; intended for use from a single asyncio event loop.
+    """
+
+    def __init__(
+        self,
+        vendor: str,
+        policy: Optional[BreakerPolicy] = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.vendor = vendor
+        self.policy = policy or BreakerPolicy()
+        self._clock = clock
+        self._state = BreakerState.CLOSED
+        self._opened_at = 0.0
+        self._probe_seq = 0
+        self._probe: Optional[int] = None
+        self._probe_admitted_at = 0.0
+        # (timestamp, failed, slow)
+        self._outcomes: Deque[Tuple[float, bool, bool]] = deque()
+
+    @property
+    def state(self) -> BreakerState:
+        """
+        Current state (read-only). An open breaker whose timeout has elapsed stays OPEN here
+        until the next `before_call()` admits the probe.
+        """
+        return self._state
+
+    # ---------- Call guarding ----------
+
+    def before_call(self) -> Optional[int]:
+        """
+        Admit or reject a call. Raises `CircuitOpenError` when the call must fail fast.
+
+        Returns a probe token when this call is the single half-open probe, otherwise None.
+        """
+        if self._state is BreakerState.CLOSED:
+            return None
+        if self._state is BreakerState.HALF_OPEN and self._probe is not None:
+            deadline = self._probe_admitted_at + self.policy.probe_timeout_seconds
+            if self._clock() >= deadline:
+                # The probe never reported back: count it as failed at its deadline. Its late
+                # result (if any) no longer matches the current token and is dropped.
+                self._probe = None
+                self._open(deadline, reason="probe_timeout")
+        if self._state is BreakerState.OPEN:
+            retry_after = self._retry_after()
+            if retry_after > 0:
+                raise CircuitOpenError(self.vendor, retry_after)
+            self._transition(BreakerState.HALF_OPEN, reason="open_timeout_elapsed")
+        if self._probe is None:
+            self._probe_seq += 1
+            self._probe = self._probe_seq
+            self._probe_admitted_at = self._clock()
+            return self._probe
+        raise CircuitOpenError(self.vendor, 0.0)
+
+    def record_success(self, latency_seconds: float, probe: Optional[int] = None) -> None:
+        self._record(failed=False, latency_seconds=latency_seconds, probe=probe)
+
+    def record_failure(self, latency_seconds: float, probe: Optional[int] = None) -> None:
+        self._record(failed=True, latency_seconds=latency_seconds, probe=probe)
+
+    def release_probe(self, probe: Optional[int]) -> None:
+        """
+        Give up a half-open probe slot without recording an outcome (e.g., cancellation).
+        """
+        if probe is not None and probe == self._probe:
+            self._probe = None
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        *,
+        is_failure: Callable[[BaseException], bool] = lambda e: True,
+    ) -> T:
+        probe = self.before_call()
+        started = self._clock()
+        try:
+            result = await fn()
+        except Exception as e:
+            if is_failure(e):
+                self.record_failure(self._clock() - started, probe)
+            else:
+                self.record_success(self._clock() - started, probe)
+            raise
+        except BaseException:
+            self.release_probe(probe)
+            raise
+        self.record_success(self._clock() - started, probe)
+        return result
+
+    # ---------- Internals ----------
+
+    def _retry_after(self) -> float:
+        return self._opened_at + self.policy.open_seconds - self._clock()
+
+    def _record(self, *, failed: bool, latency_seconds: float, probe: Optional[int]) -> None:
+        slow = latency_seconds >= self.policy.slow_call_seconds
+        now = self._clock()
+
+        if self._state is BreakerState.HALF_OPEN:
+            if probe is None or probe != self._probe:
+                # Late result from a call admitted before the probe; only the probe decides.
+                return
+            self._probe = None
+            if failed or slow:
+                self._open(now, reason="probe_failed" if failed else "probe_slow")
+            else:
+                self._outcomes.clear()
+                self._transition(BreakerState.CLOSED, reason="probe_succeeded")
+            return
+
+        if self._state is BreakerState.OPEN or probe is not None:
+            # Late result from a call admitted before the breaker opened (or a stale probe).
+            return
+
+        self._outcomes.append((now, failed, slow))
+        horizon = now - self.policy.window_seconds
+        while self._outcomes and self._outcomes[0][0] < horizon:
+            self._outcomes.popleft()
+
+        calls = len(self._outcomes)
+        if calls < self.policy.min_calls:
+            return
+        failure_rate, slow_rate = self._rates()
+        if failure_rate >= self.policy.failure_rate_threshold:
+            self._open(now, reason="failure_rate")
+        elif slow_rate >= self.policy.slow_call_rate_threshold:
+            self._open(now, reason="slow_call_rate")
+
+    def _rates(self) -> Tuple[float, float]:
+        calls = len(self._outcomes)
+        if not calls:
+            return 0.0, 0.0
+        failed = sum(1 for _, f, _ in self._outcomes if f)
+        slow = sum(1 for _, _, s in self._outcomes if s)
+        return failed / calls, slow / calls
+
+    def _open(self, now: float, *, reason: str) -> None:
+        self._opened_at = now
+        self._transition(BreakerState.OPEN, reason=reason)
+
+    def _transition(self, to_state: BreakerState, *, reason: str) -> None:
+        from_state = self._state
+        self._state = to_state
+        failure_rate, slow_rate = self._rates()
+        level = logging.WARNING if to_state is BreakerState.OPEN else logging.INFO
+        logger.log(
+            level,
+            "http.breaker_state_changed",
+            extra={
+                "event": "http.breaker_state_changed",
+                "vendor": self.vendor,
+                "from_state": from_state.value,
+                "to_state": to_state.value,
+                "reason": reason,
+                "failure_rate": failure_rate,
+                "slow_call_rate": slow_rate,
+                "calls": len(self._outcomes),
+            },
+        )
+
+
+class BreakerRegistry:
+    """
+    One breaker per vendor, created lazily with the default policy or a per-vendor override.
+    """
+
+    def __init__(
+        self,
+        policy: Optional[BreakerPolicy] = None,
+        overrides: Optional[Mapping[str, BreakerPolicy]] = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.policy = policy or BreakerPolicy()
+        self._overrides = {k.strip().lower(): v for k, v in (overrides or {}).items()}
+        self._clock = clock
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    @staticmethod
+    def from_settings(settings: Mapping[str, Any]) -> "BreakerRegistry":
+        """
+        Build from parsed settings: `[breaker]` defaults plus optional `[vendors.<name>.breaker]`.
+        """
+        section = settings.get("breaker") or {}
+        if not isinstance(section, Mapping):
+            raise BreakerConfigError("[breaker] must be a table")
+        policy = BreakerPolicy.from_mapping(section)
+
+        overrides: Dict[str, BreakerPolicy] = {}
+        vendors = settings.get("vendors") or {}
+        if not isinstance(vendors, Mapping):
+            raise BreakerConfigError("[vendors] must be a table")
+        for name, cfg in vendors.items():
+            vendor_breaker = (cfg or {}).get("breaker") if isinstance(cfg, Mapping) else None
+            if vendor_breaker:
+                if not isinstance(vendor_breaker, Mapping):
+                    raise BreakerConfigError(f"[vendors.{name}.breaker] must be a table")
+                overrides[name] = BreakerPolicy.from_mapping(vendor_breaker, base=policy)
+        return BreakerRegistry(policy, overrides)
+
+    def get(self, vendor: str) -> CircuitBreaker:
+        key = vendor.strip().lower()
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(key, self._overrides.get(key, self.policy), clock=self._clock)
+            self._breakers[key] = breaker
+        return breaker
+
+    def is_open(self, vendor: str) -> bool:
+        """
+        True while the vendor is failing fast and no probe is due yet. Once `open_seconds`
+        has elapsed this returns False, so callers go through `before_call()`/`call()` and
+        the next call becomes the recovery probe.
+        """
+        breaker = self.get(vendor)
+        return breaker.state is BreakerState.OPEN and breaker._retry_after() > 0
+
+    def states(self) -> Dict[str, BreakerState]:
+        return {k: b.state for k, b in self._breakers.items()}
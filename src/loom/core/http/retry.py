@@ -8,5 +8,7 @@ Centralizes tenacity-based retry configuration so all clients behave consistentl
 - bounded exponential backoff,
 - per-request timeout enforcement.
 
+`CircuitOpenError` (see `breaker.py`) is never retried: an open breaker must fail fast.
+
 Vendor clients should import retry helpers from here rather than configuring tenacity ad hoc.
 """
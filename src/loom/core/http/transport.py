@@ -6,6 +6,9 @@ Responsibilities:
 - manage a shared httpx.AsyncClient lifecycle (timeouts, headers, connection pooling),
 - provide request helpers used by vendor clients,
 - integrate retry/backoff and caching hooks,
+- guard each attempt with the vendor's circuit breaker (`breaker.BreakerRegistry`); while a
+  breaker is open, serve a cached response if one exists (ignoring TTL) or raise
+  `CircuitOpenError` immediately,
 - emit observability events for request timing and outcomes.
 
 This module is vendor-agnostic.
@@ -4,4 +4,157 @@ Base provider interface for narrative generation.
 
 Defines the minimal contract providers must implement (e.g., generate(text, model, params) -> result)
 and common data structures for consistent error handling and token usage reporting.
+
+Streaming is the primitive:
+- Providers implement `stream(...)`, yielding `StreamChunk`s as tokens arrive from the vendor.
+- `generate(...)` is derived from `stream(...)` and assembles a complete `ProviderResult`, so
+  the engine can either consume tokens incrementally or wait for the full completion.
+- Chunks may carry cumulative `TokenUsage` (vendors typically report it on the final chunk).
+  `StreamAccumulator` keeps the latest usage seen, so a stream that is cancelled part-way
+  (e.g., the losing side of a hedged call) still reports the tokens it consumed.
+
+Error handling:
+- Vendor/SDK failures should be wrapped in `ProviderError` (keep the original as __cause__).
 """
+from __future__ import annotations
+
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional
+
+
+class ProviderError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class TokenUsage:
+    """
+    Token accounting for a single provider call.
+
+    Serializes (via `as_dict`) to the `NarrativeResult.context_window_usage` shape.
+    """
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+        }
+
+    def __add__(self, other: "TokenUsage") -> "TokenUsage":
+        return TokenUsage(
+            prompt_tokens=self.prompt_tokens + other.prompt_tokens,
+            completion_tokens=self.completion_tokens + other.completion_tokens,
+        )
+
+
+@dataclass(frozen=True)
+class StreamChunk:
+    """
+    Incremental provider output.
+
+    - text: newly generated text (delta, not cumulative)
+    - usage: cumulative usage for the call so far, when the vendor reports it
+    """
+    text: str = ""
+    usage: Optional[TokenUsage] = None
+
+
+@dataclass(frozen=True)
+class ProviderResult:
+    """
+    Normalized output of a completed provider call.
+    """
+    text: str
+    provider: str
+    model: str
+    usage: TokenUsage
+    latency_seconds: float
+
+
+@dataclass
+class StreamAccumulator:
+    """
+    Assembles streamed chunks into a `ProviderResult`.
+
+    Mutable on purpose: callers that may cancel a stream keep a reference to the accumulator
+    and read `usage` afterwards to account for partially consumed tokens.
+    """
+    provider: str
+    model: str
+    started_at: float = field(default_factory=time.monotonic)
+    parts: List[str] = field(default_factory=list)
+    usage: TokenUsage = field(default_factory=TokenUsage)
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    def add(self, chunk: StreamChunk) -> None:
+        if chunk.text:
+            self.parts.append(chunk.text)
+        if chunk.usage is not None:
+            self.usage = chunk.usage
+
+    def result(self) -> ProviderResult:
+        return ProviderResult(
+            text=self.text,
+            provider=self.provider,
+            model=self.model,
+            usage=self.usage,
+            latency_seconds=time.monotonic() - self.started_at,
+        )
+
+
+class SummarizationProvider(ABC):
+    """
+    Provider contract. Concrete vendors implement `stream`; `generate` is derived from it.
+
+    - name: stable provider key (matches `[narrative] provider` in settings)
+    - model: default model used when a call does not override it
+    """
+
+    name: str = "base"
+
+    def __init__(self, model: str) -> None:
+        self.model = model
+
+    @abstractmethod
+    def stream(
+        self,
+        text: str,
+        *,
+        model: Optional[str] = None,
+        params: Optional[Mapping[str, Any]] = None,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Yield `StreamChunk`s as the vendor produces tokens (implemented as an async generator).
+        Raises `ProviderError` on vendor failure.
+        """
+        raise NotImplementedError
+
+    async def generate(
+        self,
+        text: str,
+        *,
+        model: Optional[str] = None,
+        params: Optional[Mapping[str, Any]] = None,
+        accumulator: Optional[StreamAccumulator] = None,
+    ) -> ProviderResult:
+        """
+        Run `stream(...)` to completion and return the assembled result.
+
+        Pass an `accumulator` to observe partial output/usage if the call may be cancelled.
+        """
+        acc = accumulator or StreamAccumulator(provider=self.name, model=model or self.model)
+        async for chunk in self.stream(text, model=model, params=params):
+            acc.add(chunk)
+        return acc.result()
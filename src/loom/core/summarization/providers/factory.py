@@ -4,4 +4,465 @@ Provider factory for summarization.
 
 Selects and constructs provider implementations based on configuration (env/settings file),
 supporting easy swapping between OpenAI/Anthropic/Gemini (and future providers).
+
+Registry:
+- Provider modules call `register_provider(name, constructor)`; constructors take the model name.
+- Tests register fake providers the same way (e.g., scripted latencies via asyncio.sleep).
+
+Hedging (optional):
+- When `[narrative] hedge_provider` is set, `build_provider(...)` wraps the primary in a
+  `HedgedProvider`. If the primary has not answered within a rolling latency percentile
+  (`HedgePolicy`), the same request is started on the secondary; whichever finishes first
+  wins and the other is cancelled.
+- `generate(...)` races full completions. `stream(...)` races time-to-first-chunk, then commits
+  to the winning stream.
+- If the primary fails before the hedge delay elapses, the secondary starts immediately.
+- Token usage is recorded for every attempt as a `UsageRecord` and handed to the `on_usage`
+  sink (wired through `build_provider`). Cancelled attempts report the usage streamed before
+  cancellation. Only a bounded history is kept on the provider itself.
+
+Observability:
+- `event="llm.hedge_started"` when the secondary is launched.
+- `event="llm.hedge_resolved"` with the winning provider and per-attempt usage.
 """
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from .base import (
+    ProviderError,
+    ProviderResult,
+    StreamAccumulator,
+    StreamChunk,
+    SummarizationProvider,
+    TokenUsage,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+ProviderConstructor = Callable[[str], SummarizationProvider]
+
+_REGISTRY: Dict[str, ProviderConstructor] = {}
+
+
+class ProviderConfigError(RuntimeError):
+    pass
+
+
+def register_provider(name: str, constructor: ProviderConstructor) -> None:
+    _REGISTRY[name.strip().lower()] = constructor
+
+
+def create_provider(name: str, model: str) -> SummarizationProvider:
+    key = (name or "").strip().lower()
+    constructor = _REGISTRY.get(key)
+    if constructor is None:
+        known = ", ".join(sorted(_REGISTRY)) or "<none>"
+        raise ProviderConfigError(f"Unknown narrative provider: {name!r} (registered: {known})")
+    if not model:
+        raise ProviderConfigError(f"No model configured for narrative provider: {key}")
+    return constructor(model)
+
+
+# ---------- Hedging ----------
+
+
+class LatencyTracker:
+    """
+    Rolling window of observed latencies (seconds) with nearest-rank percentiles.
+    """
+
+    def __init__(self, window: int = 200) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(1, math.ceil(q * len(ordered)))
+        return ordered[min(rank, len(ordered)) - 1]
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """
+    When to start the secondary request.
+
+    - percentile: primary latency percentile used as the hedge delay once warmed up
+    - min_samples: observations required before the percentile is trusted
+    - initial_delay_seconds: hedge delay used until min_samples are observed
+    - min_delay_seconds / max_delay_seconds: clamp applied to the percentile
+    - window: number of recent primary latencies kept
+    """
+    percentile: float = 0.95
+    min_samples: int = 20
+    initial_delay_seconds: float = 10.0
+    min_delay_seconds: float = 1.0
+    max_delay_seconds: float = 30.0
+    window: int = 200
+
+    def __post_init__(self) -> None:
+        if not 0.0 < self.percentile <= 1.0:
+            raise ProviderConfigError(f"hedge percentile must be in (0, 1]: {self.percentile}")
+        for name in ("initial_delay_seconds", "max_delay_seconds"):
+            value = getattr(self, name)
+            if not value > 0.0:
+                raise ProviderConfigError(f"hedge {name} must be > 0: {value}")
+        if self.min_delay_seconds < 0.0:
+            raise ProviderConfigError(
+                f"hedge min_delay_seconds must be >= 0: {self.min_delay_seconds}"
+            )
+        if self.window < 1:
+            raise ProviderConfigError(f"hedge window must be >= 1: {self.window}")
+        if not 0 <= self.min_samples <= self.window:
+            raise ProviderConfigError(
+                f"hedge min_samples must be in [0, window={self.window}]: {self.min_samples}"
+            )
+        if self.min_delay_seconds > self.max_delay_seconds:
+            raise ProviderConfigError("hedge min_delay_seconds must not exceed max_delay_seconds")
+
+    def delay(self, tracker: LatencyTracker) -> float:
+        observed = tracker.percentile(self.percentile)
+        if observed is None or len(tracker) < self.min_samples:
+            return self.initial_delay_seconds
+        return min(max(observed, self.min_delay_seconds), self.max_delay_seconds)
+
+
+@dataclass(frozen=True)
+class UsageRecord:
+    """
+    Token usage for one attempt of a (possibly hedged) call.
+
+    - role: "primary" | "secondary"
+    - outcome:
+      - "won": the attempt whose output was returned, run to completion
+      - "completed": `generate` only; finished successfully in the same round as the winner
+        but was not used (full token cost, output discarded)
+      - "cancelled": stopped before completion, either as the losing side of the race or
+        because the consumer of a stream stopped early (usage is what was streamed so far)
+      - "failed": raised an error (including a winning stream that fails mid-way)
+    """
+    provider: str
+    model: str
+    role: str
+    outcome: str
+    usage: TokenUsage
+    latency_seconds: float
+
+
+@dataclass
+class _Attempt:
+    role: str
+    provider: SummarizationProvider
+    acc: StreamAccumulator
+    task: Optional["asyncio.Task[Any]"] = None
+    record: Optional[UsageRecord] = None
+
+    def finish(self, outcome: str) -> UsageRecord:
+        self.record = UsageRecord(
+            provider=self.acc.provider,
+            model=self.acc.model,
+            role=self.role,
+            outcome=outcome,
+            usage=self.acc.usage,
+            latency_seconds=time.monotonic() - self.acc.started_at,
+        )
+        return self.record
+
+
+class HedgedProvider(SummarizationProvider):
+    """
+    Wraps a primary and secondary provider with latency-percentile hedging.
+
+    A per-call `model` override applies to the primary only; the secondary uses its own model.
+    Every attempt is passed to `on_usage` when provided; `usage_records` keeps only the last
+    `usage_history` records for inspection.
+    """
+
+    name = "hedged"
+
+    def __init__(
+        self,
+        primary: SummarizationProvider,
+        secondary: SummarizationProvider,
+        policy: Optional[HedgePolicy] = None,
+        *,
+        on_usage: Optional[Callable[[UsageRecord], None]] = None,
+        usage_history: int = 100,
+    ) -> None:
+        super().__init__(primary.model)
+        self.primary = primary
+        self.secondary = secondary
+        self.policy = policy or HedgePolicy()
+        self.on_usage = on_usage
+        self.usage_records: Deque[UsageRecord] = deque(maxlen=usage_history)
+        # Separate trackers: generate() hedges on completion, stream() on first chunk.
+        self.completion_latency = LatencyTracker(self.policy.window)
+        self.first_chunk_latency = LatencyTracker(self.policy.window)
+
+    def _record(self, attempt: _Attempt, outcome: str) -> UsageRecord:
+        rec = attempt.finish(outcome)
+        self.usage_records.append(rec)
+        if self.on_usage is not None:
+            self.on_usage(rec)
+        return rec
+
+    def _attempt(self, role: str, model: Optional[str]) -> _Attempt:
+        provider = self.primary if role == "primary" else self.secondary
+        acc = StreamAccumulator(provider=provider.name, model=model or provider.model)
+        return _Attempt(role=role, provider=provider, acc=acc)
+
+    async def _race(
+        self,
+        model: Optional[str],
+        run: Callable[[_Attempt], Awaitable[T]],
+        tracker: LatencyTracker,
+        done_outcome: str,
+    ) -> Tuple[_Attempt, List[_Attempt], T]:
+        """
+        Start the primary, hedge onto the secondary after the policy delay (or on early primary
+        failure), and return the first successful attempt. Losers are cancelled and recorded;
+        a loser whose `run` already succeeded in the winner's round is recorded as
+        `done_outcome`.
+        """
+        primary = self._attempt("primary", model)
+        primary.task = asyncio.ensure_future(run(primary))
+        attempts = [primary]
+        delay = self.policy.delay(tracker)
+        last_error: Optional[BaseException] = None
+        winner: Optional[_Attempt] = None
+
+        try:
+            done, _ = await asyncio.wait({primary.task}, timeout=delay)
+            if primary.task in done and primary.task.exception() is None:
+                tracker.record(time.monotonic() - primary.acc.started_at)
+                winner = primary
+                return primary, attempts, primary.task.result()
+
+            if primary.task in done:
+                last_error = primary.task.exception()
+                self._record(primary, "failed")
+            secondary = self._attempt("secondary", None)
+            secondary.task = asyncio.ensure_future(run(secondary))
+            attempts.append(secondary)
+            logger.info(
+                "llm.hedge_started",
+                extra={
+                    "event": "llm.hedge_started",
+                    "primary": self.primary.name,
+                    "secondary": self.secondary.name,
+                    "delay_seconds": delay,
+                    "primary_failed": last_error is not None,
+                },
+            )
+
+            pending = {a.task for a in attempts if not a.task.done()}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in attempts:
+                    if attempt.task not in done:
+                        continue
+                    if attempt.task.exception() is None:
+                        if attempt.role == "primary":
+                            tracker.record(time.monotonic() - attempt.acc.started_at)
+                        winner = attempt
+                        return attempt, attempts, attempt.task.result()
+                    last_error = attempt.task.exception()
+                    self._record(attempt, "failed")
+
+            raise ProviderError(
+                f"All hedged attempts failed ({self.primary.name}, {self.secondary.name})"
+            ) from last_error
+        finally:
+            await self._cancel_losers(attempts, winner, tracker, done_outcome)
+
+    async def _cancel_losers(
+        self,
+        attempts: List[_Attempt],
+        winner: Optional[_Attempt],
+        tracker: LatencyTracker,
+        done_outcome: str,
+    ) -> None:
+        """
+        Cancel and record every attempt that did not win and has no record yet, including
+        attempts that finished in the same round as the winner.
+        """
+        losers = [a for a in attempts if a is not winner and a.record is None]
+        running = [a.task for a in losers if a.task is not None and not a.task.done()]
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+        for attempt in losers:
+            task = attempt.task
+            outcome = "cancelled"
+            if task is not None and task.done() and not task.cancelled():
+                outcome = "failed" if task.exception() is not None else done_outcome
+            if attempt.role == "primary" and winner is not None and winner.role == "secondary":
+                # Censored sample: the primary took at least this long.
+                tracker.record(time.monotonic() - attempt.acc.started_at)
+            self._record(attempt, outcome)
+
+    def _resolved(self, winner: _Attempt, attempts: List[_Attempt]) -> None:
+        logger.info(
+            "llm.hedge_resolved",
+            extra={
+                "event": "llm.hedge_resolved",
+                "winner": winner.acc.provider,
+                "role": winner.role,
+                "attempts": [
+                    {"provider": r.provider, "outcome": r.outcome, **r.usage.as_dict()}
+                    for r in (a.record for a in attempts)
+                    if r is not None
+                ],
+            },
+        )
+
+    async def generate(
+        self,
+        text: str,
+        *,
+        model: Optional[str] = None,
+        params: Optional[Mapping[str, Any]] = None,
+        accumulator: Optional[StreamAccumulator] = None,
+    ) -> ProviderResult:
+        async def run(attempt: _Attempt) -> ProviderResult:
+            m = model if attempt.role == "primary" else None
+            return await attempt.provider.generate(
+                text, model=m, params=params, accumulator=attempt.acc
+            )
+
+        winner, attempts, result = await self._race(
+            model, run, self.completion_latency, done_outcome="completed"
+        )
+        self._record(winner, "won")
+        self._resolved(winner, attempts)
+        if accumulator is not None:
+            accumulator.add(StreamChunk(text=result.text, usage=result.usage))
+        return result
+
+    async def stream(
+        self,
+        text: str,
+        *,
+        model: Optional[str] = None,
+        params: Optional[Mapping[str, Any]] = None,
+    ) -> AsyncIterator[StreamChunk]:
+        streams: Dict[str, AsyncIterator[StreamChunk]] = {}
+
+        async def first_chunk(attempt: _Attempt) -> Optional[StreamChunk]:
+            m = model if attempt.role == "primary" else None
+            it = attempt.provider.stream(text, model=m, params=params).__aiter__()
+            streams[attempt.role] = it
+            try:
+                chunk = await it.__anext__()
+            except StopAsyncIteration:
+                return None
+            attempt.acc.add(chunk)
+            return chunk
+
+        winner: Optional[_Attempt] = None
+        try:
+            # A same-round loser only produced its first chunk; it is closed, not completed.
+            winner, attempts, chunk = await self._race(
+                model, first_chunk, self.first_chunk_latency, done_outcome="cancelled"
+            )
+        finally:
+            for role, other in streams.items():
+                if winner is None or role != winner.role:
+                    await _aclose(other)
+        it = streams[winner.role]
+        # A consumer that stops early leaves the winner "cancelled"; a mid-stream error is
+        # "failed"; only a stream run to completion is "won".
+        outcome = "cancelled"
+        try:
+            if chunk is not None:
+                yield chunk
+                async for chunk in it:
+                    winner.acc.add(chunk)
+                    yield chunk
+            outcome = "won"
+        except (GeneratorExit, asyncio.CancelledError):
+            raise
+        except Exception:
+            outcome = "failed"
+            raise
+        finally:
+            await _aclose(it)
+            self._record(winner, outcome)
+            self._resolved(winner, attempts)
+
+
+async def _aclose(it: AsyncIterator[StreamChunk]) -> None:
+    aclose = getattr(it, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
+# ---------- Configuration ----------
+
+
+def build_provider(
+    narrative: Mapping[str, Any],
+    *,
+    on_usage: Optional[Callable[[UsageRecord], None]] = None,
+) -> SummarizationProvider:
+    """
+    Construct the configured provider from the `[narrative]` settings section.
+
+    Wraps it in a `HedgedProvider` when `hedge_provider` is set; `on_usage` receives a
+    `UsageRecord` for every hedged attempt.
+    """
+    primary = create_provider(
+        str(narrative.get("provider") or ""), str(narrative.get("model") or "")
+    )
+
+    hedge_name = narrative.get("hedge_provider")
+    if not hedge_name:
+        return primary
+
+    secondary = create_provider(str(hedge_name), str(narrative.get("hedge_model") or ""))
+    defaults = HedgePolicy()
+    try:
+        policy = HedgePolicy(
+            percentile=float(narrative.get("hedge_percentile", defaults.percentile)),
+            min_samples=int(narrative.get("hedge_min_samples", defaults.min_samples)),
+            initial_delay_seconds=float(
+                narrative.get("hedge_initial_delay_seconds", defaults.initial_delay_seconds)
+            ),
+            min_delay_seconds=float(
+                narrative.get("hedge_min_delay_seconds", defaults.min_delay_seconds)
+            ),
+            max_delay_seconds=float(
+                narrative.get("hedge_max_delay_seconds", defaults.max_delay_seconds)
+            ),
+        )
+    except (TypeError, ValueError) as e:
+        raise ProviderConfigError(f"Invalid narrative hedge settings: {e}") from e
+    return HedgedProvider(primary, secondary, policy, on_usage=on_usage)
@@ -11,6 +11,9 @@ Defines stable event names such as:
 - cache.hit
 - cache.miss
 - cache.write
+- http.breaker_state_changed
+- llm.hedge_started
+- llm.hedge_resolved
 
 Includes small helpers to create consistent structured payloads for logging and debug reporting.
 """
@@ -7,5 +7,9 @@ Defines a stable strategy contract returning:
 - List[NarrativeResult],
 - summary metadata used by export/validation.
 
+Vendor outages surface as `CircuitOpenError` (core/http/breaker.py). Strategies must not abort
+the batch on it: continue with cached data where the transport served it, otherwise treat the
+affected metrics as missing and apply `missingness_policy`.
+
 Concrete strategies should parallelize independent vendor calls via asyncio.gather where appropriate.
 """
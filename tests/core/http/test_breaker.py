@@ -0,0 +1,308 @@
+import asyncio
+import logging
+
+import pytest
+
+from loom.core.http.breaker import (
+    BreakerConfigError,
+    BreakerPolicy,
+    BreakerRegistry,
+    BreakerState,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+POLICY = BreakerPolicy(
+    window_seconds=60,
+    min_calls=4,
+    failure_rate_threshold=0.5,
+    slow_call_seconds=5,
+    slow_call_rate_threshold=0.75,
+    open_seconds=30,
+)
+
+
+def make_breaker(policy: BreakerPolicy = POLICY) -> tuple[CircuitBreaker, FakeClock]:
+    clock = FakeClock()
+    return CircuitBreaker("fmp", policy, clock=clock), clock
+
+
+def trip(breaker: CircuitBreaker) -> None:
+    for _ in range(POLICY.min_calls):
+        breaker.before_call()
+        breaker.record_failure(0.1)
+    assert breaker.state is BreakerState.OPEN
+
+
+def test_trips_on_failure_rate_after_min_calls():
+    breaker, _ = make_breaker()
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure(0.1)
+    # Below min_calls: 100% failure rate does not trip yet.
+    assert breaker.state is BreakerState.CLOSED
+
+    breaker.before_call()
+    breaker.record_failure(0.1)
+    assert breaker.state is BreakerState.OPEN
+
+
+def test_failure_rate_below_threshold_stays_closed():
+    breaker, _ = make_breaker()
+    for failed in (True, False, False, False):
+        breaker.before_call()
+        if failed:
+            breaker.record_failure(0.1)
+        else:
+            breaker.record_success(0.1)
+    assert breaker.state is BreakerState.CLOSED
+
+
+def test_trips_on_slow_call_rate():
+    breaker, _ = make_breaker()
+    for latency in (6, 6, 6, 0.1):
+        breaker.before_call()
+        breaker.record_success(latency)
+    assert breaker.state is BreakerState.OPEN
+
+
+def test_outcomes_outside_window_are_evicted():
+    breaker, clock = make_breaker()
+    for _ in range(3):
+        breaker.record_failure(0.1)
+    clock.advance(61)
+    breaker.record_failure(0.1)
+    assert breaker.state is BreakerState.CLOSED
+
+
+def test_open_breaker_fails_fast_with_retry_after():
+    breaker, clock = make_breaker()
+    trip(breaker)
+    clock.advance(10)
+
+    calls = []
+
+    async def fn():
+        calls.append(1)
+
+    with pytest.raises(CircuitOpenError) as exc:
+        asyncio.run(breaker.call(fn))
+    assert exc.value.vendor == "fmp"
+    assert exc.value.retry_after_seconds == pytest.approx(20)
+    assert calls == []
+
+
+def test_state_read_does_not_transition(caplog):
+    breaker, clock = make_breaker()
+    trip(breaker)
+    clock.advance(31)
+    caplog.clear()
+    with caplog.at_level(logging.INFO, logger="loom.core.http.breaker"):
+        assert breaker.state is BreakerState.OPEN
+        assert breaker.state is BreakerState.OPEN
+    assert not caplog.records
+
+
+def test_half_open_admits_single_probe_and_closes_on_success():
+    breaker, clock = make_breaker()
+    trip(breaker)
+    clock.advance(30)
+
+    probe = breaker.before_call()
+    assert probe is not None
+    assert breaker.state is BreakerState.HALF_OPEN
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.before_call()
+    assert exc.value.retry_after_seconds == 0.0
+
+    breaker.record_success(0.1, probe)
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.before_call() is None
+
+
+@pytest.mark.parametrize("failed, latency", [(True, 0.1), (False, 6)])
+def test_failed_or_slow_probe_reopens(failed, latency):
+    breaker, clock = make_breaker()
+    trip(breaker)
+    clock.advance(30)
+
+    probe = breaker.before_call()
+    if failed:
+        breaker.record_failure(latency, probe)
+    else:
+        breaker.record_success(latency, probe)
+    assert breaker.state is BreakerState.OPEN
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.before_call()
+    assert exc.value.retry_after_seconds == pytest.approx(30)
+
+
+def test_cancelled_probe_releases_slot():
+    breaker, clock = make_breaker()
+    trip(breaker)
+    clock.advance(30)
+
+    async def cancelled():
+        raise asyncio.CancelledError()
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(breaker.call(cancelled))
+    assert breaker.state is BreakerState.HALF_OPEN
+
+    probe = breaker.before_call()
+    assert probe is not None
+
+
+def test_release_probe_ignores_foreign_token():
+    breaker, clock = make_breaker()
+    trip(breaker)
+    clock.advance(30)
+
+    probe = breaker.before_call()
+    breaker.release_probe(None)
+    breaker.release_probe(probe + 1)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_hung_probe_times_out_and_new_probe_is_admitted():
+    breaker, clock = make_breaker()
+    trip(breaker)
+    clock.advance(30)
+    hung = breaker.before_call()
+
+    clock.advance(1e6)
+    probe = breaker.before_call()
+    assert probe is not None and probe != hung
+    assert breaker.state is BreakerState.HALF_OPEN
+
+    # The hung probe's late result no longer decides anything.
+    breaker.record_success(0.1, hung)
+    assert breaker.state is BreakerState.HALF_OPEN
+    breaker.record_success(0.1, probe)
+    assert breaker.state is BreakerState.CLOSED
+
+
+def test_probe_timeout_reopens_from_its_deadline():
+    breaker, clock = make_breaker()
+    trip(breaker)
+    clock.advance(30)
+    hung = breaker.before_call()
+
+    # Still within probe_timeout_seconds: concurrent callers fail fast.
+    clock.advance(29)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    # Deadline at t=60; the breaker counts as reopened from then.
+    clock.advance(2)
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.before_call()
+    assert exc.value.retry_after_seconds == pytest.approx(29)
+    assert breaker.state is BreakerState.OPEN
+
+    breaker.record_success(0.1, hung)
+    assert breaker.state is BreakerState.OPEN
+
+
+@pytest.mark.parametrize("late_failed", [False, True])
+def test_stale_result_does_not_decide_half_open(late_failed):
+    breaker, clock = make_breaker()
+    # Admitted while closed; finishes after the probe is admitted.
+    late = breaker.before_call()
+    assert late is None
+    trip(breaker)
+    clock.advance(30)
+    probe = breaker.before_call()
+
+    if late_failed:
+        breaker.record_failure(0.1, late)
+    else:
+        breaker.record_success(0.1, late)
+    assert breaker.state is BreakerState.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success(0.1, probe)
+    assert breaker.state is BreakerState.CLOSED
+
+
+def test_transitions_emit_events(caplog):
+    breaker, clock = make_breaker()
+    with caplog.at_level(logging.INFO, logger="loom.core.http.breaker"):
+        trip(breaker)
+        clock.advance(30)
+        breaker.record_success(0.1, breaker.before_call())
+
+    transitions = [
+        (r.from_state, r.to_state, r.reason)
+        for r in caplog.records
+        if getattr(r, "event", None) == "http.breaker_state_changed"
+    ]
+    assert transitions == [
+        ("closed", "open", "failure_rate"),
+        ("open", "half_open", "open_timeout_elapsed"),
+        ("half_open", "closed", "probe_succeeded"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "field",
+    ["window_seconds", "slow_call_seconds", "open_seconds", "probe_timeout_seconds"],
+)
+@pytest.mark.parametrize("value", [0, -1])
+def test_policy_rejects_non_positive_durations(field, value):
+    with pytest.raises(BreakerConfigError):
+        BreakerPolicy(**{field: value})
+
+
+def test_registry_from_settings_applies_vendor_overrides():
+    registry = BreakerRegistry.from_settings(
+        {
+            "breaker": {"min_calls": 4, "open_seconds": 5},
+            "vendors": {"SEC": {"breaker": {"min_calls": 2}}, "fmp": {"base_url": "x"}},
+        }
+    )
+    fmp = registry.get("FMP")
+    sec = registry.get("sec")
+    assert fmp is registry.get("fmp")
+    assert (fmp.policy.min_calls, fmp.policy.open_seconds) == (4, 5)
+    assert (sec.policy.min_calls, sec.policy.open_seconds) == (2, 5)
+    assert registry.states() == {"fmp": BreakerState.CLOSED, "sec": BreakerState.CLOSED}
+
+
+def test_registry_is_open_clears_once_probe_is_due():
+    clock = FakeClock()
+    registry = BreakerRegistry(POLICY, clock=clock)
+    trip(registry.get("fmp"))
+    assert registry.is_open("fmp")
+
+    clock.advance(10_000)
+    assert not registry.is_open("fmp")
+    assert registry.get("fmp").before_call() is not None
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {"breaker": ["not", "a", "table"]},
+        {"vendors": ["fmp"]},
+        {"vendors": {"fmp": {"breaker": "nope"}}},
+        {"breaker": {"min_calls": "many"}},
+    ],
+)
+def test_registry_from_settings_rejects_bad_shapes(settings):
+    with pytest.raises(BreakerConfigError):
+        BreakerRegistry.from_settings(settings)
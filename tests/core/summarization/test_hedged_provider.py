@@ -0,0 +1,321 @@
+import asyncio
+
+import pytest
+
+from loom.core.summarization.providers.base import (
+    ProviderError,
+    StreamChunk,
+    SummarizationProvider,
+    TokenUsage,
+)
+from loom.core.summarization.providers import factory
+from loom.core.summarization.providers.factory import (
+    HedgedProvider,
+    HedgePolicy,
+    ProviderConfigError,
+    build_provider,
+    register_provider,
+)
+
+
+class ScriptedProvider(SummarizationProvider):
+    """
+    Fake provider: sleeps `delays[i]` (and waits on `gate`, if set) before emitting chunk i.
+    With `fail=True` it raises ProviderError instead of emitting the first chunk; with
+    `fail_after=n` it raises after emitting n chunks.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        delays: list[float],
+        *,
+        fail: bool = False,
+        gate: asyncio.Event | None = None,
+        fail_after: int | None = None,
+        model: str = "m",
+    ) -> None:
+        super().__init__(model)
+        self.name = name
+        self.delays = delays
+        self.fail = fail
+        self.gate = gate
+        self.fail_after = fail_after
+        self.calls = 0
+        self.closed = False
+
+    async def stream(self, text, *, model=None, params=None):
+        self.calls += 1
+        try:
+            for n, delay in enumerate(self.delays, start=1):
+                await asyncio.sleep(delay)
+                if self.gate is not None:
+                    await self.gate.wait()
+                if self.fail or (self.fail_after is not None and n > self.fail_after):
+                    raise ProviderError(f"{self.name} failed")
+                yield StreamChunk(
+                    text=f"{self.name}{n} ",
+                    usage=TokenUsage(prompt_tokens=10, completion_tokens=n),
+                )
+        finally:
+            self.closed = True
+
+
+def hedged(primary, secondary, delay=0.05) -> HedgedProvider:
+    policy = HedgePolicy(initial_delay_seconds=delay, min_delay_seconds=0.001)
+    return HedgedProvider(primary, secondary, policy)
+
+
+def outcomes(provider: HedgedProvider) -> set[tuple[str, str, str]]:
+    return {(r.provider, r.role, r.outcome) for r in provider.usage_records}
+
+
+def test_primary_wins_before_hedge_delay():
+    p = ScriptedProvider("p", [0.01])
+    s = ScriptedProvider("s", [0.01])
+    h = hedged(p, s, delay=0.5)
+
+    result = asyncio.run(h.generate("x"))
+
+    assert result.provider == "p"
+    assert result.text == "p1 "
+    assert s.calls == 0
+    assert outcomes(h) == {("p", "primary", "won")}
+    assert len(h.completion_latency) == 1
+
+
+def test_secondary_wins_after_delay_and_primary_partial_usage_recorded():
+    p = ScriptedProvider("p", [0.01, 1.0])
+    s = ScriptedProvider("s", [0.01, 0.01], model="s-model")
+    h = hedged(p, s, delay=0.05)
+
+    result = asyncio.run(h.generate("x", model="p-model"))
+
+    assert (result.provider, result.model, result.text) == ("s", "s-model", "s1 s2 ")
+    assert outcomes(h) == {("p", "primary", "cancelled"), ("s", "secondary", "won")}
+    cancelled = next(r for r in h.usage_records if r.outcome == "cancelled")
+    assert cancelled.model == "p-model"
+    assert cancelled.usage == TokenUsage(prompt_tokens=10, completion_tokens=1)
+    assert p.closed
+    # Censored primary sample: the secondary won.
+    assert len(h.completion_latency) == 1
+
+
+def test_primary_early_failure_starts_hedge_immediately():
+    p = ScriptedProvider("p", [0.01], fail=True)
+    s = ScriptedProvider("s", [0.01])
+    h = hedged(p, s, delay=5.0)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        result = await h.generate("x")
+        return result, loop.time() - started
+
+    result, elapsed = asyncio.run(run())
+
+    assert result.provider == "s"
+    assert elapsed < 1.0
+    assert outcomes(h) == {("p", "primary", "failed"), ("s", "secondary", "won")}
+    assert len(h.completion_latency) == 0
+
+
+def test_both_attempts_failing_raises_provider_error():
+    p = ScriptedProvider("p", [0.01], fail=True)
+    s = ScriptedProvider("s", [0.01], fail=True)
+    h = hedged(p, s)
+
+    with pytest.raises(ProviderError) as exc:
+        asyncio.run(h.generate("x"))
+
+    assert isinstance(exc.value.__cause__, ProviderError)
+    assert outcomes(h) == {("p", "primary", "failed"), ("s", "secondary", "failed")}
+
+
+def test_stream_hedges_on_time_to_first_chunk():
+    p = ScriptedProvider("p", [1.0])
+    s = ScriptedProvider("s", [0.01, 0.01])
+    h = hedged(p, s, delay=0.05)
+
+    async def run():
+        return [chunk.text async for chunk in h.stream("x")]
+
+    assert asyncio.run(run()) == ["s1 ", "s2 "]
+    assert outcomes(h) == {("p", "primary", "cancelled"), ("s", "secondary", "won")}
+    won = next(r for r in h.usage_records if r.outcome == "won")
+    assert won.usage == TokenUsage(prompt_tokens=10, completion_tokens=2)
+    assert p.closed and s.closed
+    assert len(h.first_chunk_latency) == 1
+
+
+def test_winning_stream_failing_midway_is_recorded_as_failed():
+    p = ScriptedProvider("p", [0.01, 0.01], fail_after=1)
+    s = ScriptedProvider("s", [1.0])
+    h = hedged(p, s, delay=0.5)
+    received = []
+
+    async def run():
+        async for chunk in h.stream("x"):
+            received.append(chunk.text)
+
+    with pytest.raises(ProviderError):
+        asyncio.run(run())
+
+    assert received == ["p1 "]
+    assert outcomes(h) == {("p", "primary", "failed")}
+    assert h.usage_records[0].usage == TokenUsage(prompt_tokens=10, completion_tokens=1)
+    assert p.closed
+
+
+def test_stream_consumer_stopping_early_records_cancelled():
+    p = ScriptedProvider("p", [0.01, 0.01, 0.01])
+    s = ScriptedProvider("s", [1.0])
+    h = hedged(p, s, delay=0.5)
+
+    async def run():
+        stream = h.stream("x")
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first.text
+
+    assert asyncio.run(run()) == "p1 "
+    assert outcomes(h) == {("p", "primary", "cancelled")}
+    assert p.closed
+
+
+def test_same_round_finish_records_loser():
+    gate = asyncio.Event()
+    p = ScriptedProvider("p", [0.0], gate=gate)
+    s = ScriptedProvider("s", [0.0], gate=gate)
+    h = hedged(p, s, delay=0.05)
+
+    async def run():
+        task = asyncio.ensure_future(h.generate("x"))
+        await asyncio.sleep(0.1)
+        gate.set()
+        return await task
+
+    result = asyncio.run(run())
+
+    assert result.provider == "p"
+    # The secondary ran to completion; its output is discarded but its usage is recorded.
+    assert outcomes(h) == {("p", "primary", "won"), ("s", "secondary", "completed")}
+    loser = next(r for r in h.usage_records if r.outcome == "completed")
+    assert loser.usage == TokenUsage(prompt_tokens=10, completion_tokens=1)
+
+
+def test_same_round_stream_closes_losing_iterator():
+    gate = asyncio.Event()
+    p = ScriptedProvider("p", [0.0, 0.0], gate=gate)
+    s = ScriptedProvider("s", [0.0, 0.0], gate=gate)
+    h = hedged(p, s, delay=0.05)
+
+    async def run():
+        async def consume():
+            return [chunk.text async for chunk in h.stream("x")]
+
+        task = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.1)
+        gate.set()
+        return await task
+
+    assert asyncio.run(run()) == ["p1 ", "p2 "]
+    # The secondary's first chunk arrived, but its stream was closed before completion.
+    assert outcomes(h) == {("p", "primary", "won"), ("s", "secondary", "cancelled")}
+    assert s.closed
+
+
+def test_caller_cancellation_does_not_record_censored_sample():
+    p = ScriptedProvider("p", [1.0])
+    s = ScriptedProvider("s", [1.0])
+    h = hedged(p, s, delay=0.01)
+
+    async def run():
+        task = asyncio.ensure_future(h.generate("x"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+
+    assert len(h.completion_latency) == 0
+    assert outcomes(h) == {("p", "primary", "cancelled"), ("s", "secondary", "cancelled")}
+
+
+def test_usage_history_is_bounded_and_sink_sees_every_record():
+    sink = []
+    h = HedgedProvider(
+        ScriptedProvider("p", [0.0]),
+        ScriptedProvider("s", [0.0]),
+        HedgePolicy(initial_delay_seconds=1.0),
+        on_usage=sink.append,
+        usage_history=3,
+    )
+
+    async def run():
+        for _ in range(10):
+            await h.generate("x")
+
+    asyncio.run(run())
+
+    assert len(h.usage_records) == 3
+    assert len(sink) == 10
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"initial_delay_seconds": 0},
+        {"initial_delay_seconds": -5},
+        {"min_delay_seconds": -1},
+        {"max_delay_seconds": 0, "min_delay_seconds": 0},
+        {"min_samples": -3},
+        {"window": 0},
+        {"window": 10, "min_samples": 20},
+        {"percentile": 0},
+        {"min_delay_seconds": 5, "max_delay_seconds": 1},
+    ],
+)
+def test_hedge_policy_rejects_invalid_settings(kwargs):
+    with pytest.raises(ProviderConfigError):
+        HedgePolicy(**kwargs)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(factory, "_REGISTRY", dict(factory._REGISTRY))
+
+
+def test_build_provider_wraps_primary_when_hedge_configured(registry):
+    sink = []
+    register_provider(
+        "fake-primary", lambda model: ScriptedProvider("fake-primary", [0.01], model=model)
+    )
+    register_provider(
+        "fake-secondary", lambda model: ScriptedProvider("fake-secondary", [0.01], model=model)
+    )
+
+    plain = build_provider({"provider": "fake-primary", "model": "a"})
+    assert isinstance(plain, ScriptedProvider)
+
+    h = build_provider(
+        {
+            "provider": "fake-primary",
+            "model": "a",
+            "hedge_provider": "fake-secondary",
+            "hedge_model": "b",
+            "hedge_percentile": 0.9,
+        },
+        on_usage=sink.append,
+    )
+    assert isinstance(h, HedgedProvider)
+    assert (h.primary.model, h.secondary.model, h.policy.percentile) == ("a", "b", 0.9)
+
+    asyncio.run(h.generate("x"))
+    assert [(r.provider, r.outcome) for r in sink] == [("fake-primary", "won")]
+
+
+def test_registry_fixture_does_not_leak_providers():
+    with pytest.raises(ProviderConfigError):
+        factory.create_provider("fake-primary", "a")